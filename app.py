@@ -10,21 +10,25 @@ wrapper, so the setup stays visible in this single file.
 """
 
 import asyncio
+import contextlib
 import logging
 import os
 import time
 
+import grpc
 import httpx
 from fastapi import FastAPI, HTTPException, Request
 
 # --- OpenTelemetry tracing ---
 from opentelemetry import metrics, trace
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter as OTLPHTTPSpanExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace import SpanLimits, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from opentelemetry.trace import Status, StatusCode
 
 # --- OpenTelemetry logs ---
@@ -41,6 +45,10 @@ from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 
 PROVISIONING_URL = "http://127.0.0.1:8000/provisioning/slice-sessions"
 OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://127.0.0.1:4317")
+TRACES_EXPORTER = os.getenv("OTEL_TRACES_EXPORTER", "otlp")
+# Traces only: logs and metrics always use gRPC, so the generic
+# OTEL_EXPORTER_OTLP_PROTOCOL is deliberately not read here.
+OTLP_TRACES_PROTOCOL = os.getenv("OTEL_EXPORTER_OTLP_TRACES_PROTOCOL", "grpc")
 
 # Stable service and topology attributes live on the resource. Subscriber,
 # session, and policy facts are attached to spans because they vary by request.
@@ -58,23 +66,129 @@ TELECOM_RESOURCE = {
     "telecom.o_ran.o_du.id": "odu-201",
     "telecom.o_ran.o_cu.id": "ocu-504",
 }
+# Detectors run once here; all three providers share the same Resource.
+_RESOURCE = Resource.create(TELECOM_RESOURCE)
 
+# Span and event attributes that never vary between requests, built once.
+_RIC_ATTRS = {
+    "telecom.o_ran.near_rt_ric.id": "ric-210-ne",
+    "telecom.o_ran.policy.id": "policy-embb-default",
+}
+_CHARGING_ATTRS = {
+    "telecom.3gpp.chf.id": "chf-12",
+    "telecom.3gpp.charging.mode": "online",
+}
+_ELIGIBLE_EVENT = {"eligible": True}
+_RIC_POLICY_EVENT = {"policy.version": "2026.05.11"}
+_ODU_HEARTBEAT_EVENT = {
+    "telecom.o_ran.o_du.id": "odu-201",
+    "telecom.o_ran.o_du.state": "active",
+    "latency.ms": 2.3,
+}
+_RIC_DENIED_EVENT = {"reason": "policy_capacity_guard"}
+_RIC_ACCEPTED_EVENT = {"decision.latency.ms": 14.2}
+_QUOTA_EVENT = {"quota.mb": 2048}
+_WRITE_COMMITTED_EVENT = {"status": "active"}
+
+# Keep the exporter channels warm between batches and gzip the payloads,
+# which are dominated by repeated attribute strings.
+_GRPC_EXPORTER_OPTIONS = {
+    "insecure": True,
+    "compression": grpc.Compression.Gzip,
+    "channel_options": (
+        ("grpc.keepalive_time_ms", 30000),
+        ("grpc.keepalive_timeout_ms", 10000),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+    ),
+}
 
-def configure_opentelemetry():
-    """Wire up Tracer/Logger/Meter providers with OTLP gRPC exporters."""
-    resource = Resource.create(TELECOM_RESOURCE)
 
-    # --- Traces ---
-    trace_provider = TracerProvider(resource=resource)
-    trace_provider.add_span_processor(
-        BatchSpanProcessor(OTLPSpanExporter(endpoint=OTLP_ENDPOINT, insecure=True))
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to the default like the SDK does."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logging.getLogger(__name__).warning("Invalid value %r for %s, using %d", value, name, default)
+        return default
+
+
+def _env_ratio(name: str, default: float) -> float:
+    """Read a sampling ratio in [0, 1], falling back to the default like the SDK does."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        ratio = float(value)
+    except ValueError:
+        ratio = None
+    if ratio is None or not 0.0 <= ratio <= 1.0:
+        logging.getLogger(__name__).warning("Invalid value %r for %s, using %s", value, name, default)
+        return default
+    return ratio
+
+
+def _build_span_exporter():
+    """Pick the OTLP span exporter; HTTP/protobuf avoids a unary gRPC call per batch."""
+    if OTLP_TRACES_PROTOCOL == "http/protobuf":
+        # Resolves OTEL_EXPORTER_OTLP_[TRACES_]ENDPOINT itself and appends /v1/traces.
+        return OTLPHTTPSpanExporter()
+    if OTLP_TRACES_PROTOCOL != "grpc":
+        logging.getLogger(__name__).warning(
+            "Unsupported value %r for OTEL_EXPORTER_OTLP_TRACES_PROTOCOL, using grpc", OTLP_TRACES_PROTOCOL
+        )
+    return OTLPSpanExporter(endpoint=OTLP_ENDPOINT, timeout=10, **_GRPC_EXPORTER_OPTIONS)
+
+
+def _build_span_processor():
+    """Print spans as they end for local debugging; batch OTLP exports otherwise."""
+    if TRACES_EXPORTER == "console":
+        return SimpleSpanProcessor(ConsoleSpanExporter())
+    # Sized for bursts of ~10 spans per activation; batches stay well under
+    # the 4 MB gRPC message limit. The standard OTEL_BSP_* variables override.
+    return BatchSpanProcessor(
+        _build_span_exporter(),
+        max_queue_size=_env_int("OTEL_BSP_MAX_QUEUE_SIZE", 4096),
+        max_export_batch_size=_env_int("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", 128),
+        schedule_delay_millis=_env_int("OTEL_BSP_SCHEDULE_DELAY", 1000),
+        export_timeout_millis=_env_int("OTEL_BSP_EXPORT_TIMEOUT", 10000),
+    )
+
+
+def _configure_tracing() -> None:
+    # Honour upstream sampling decisions; sample every root span by default so
+    # each demo request shows up. Lower OTEL_TRACES_SAMPLER_ARG under load.
+    # An explicit OTEL_TRACES_SAMPLER is left to the SDK (sampler=None).
+    sampler = None
+    if "OTEL_TRACES_SAMPLER" not in os.environ:
+        sampler = ParentBased(root=TraceIdRatioBased(_env_ratio("OTEL_TRACES_SAMPLER_ARG", 1.0)))
+    # Bound per-span growth so a runaway helper cannot bloat a span or export.
+    span_limits = SpanLimits(
+        max_span_attributes=64,
+        max_events=128,
+        max_event_attributes=16,
+        max_attribute_length=512,
     )
+    trace_provider = TracerProvider(resource=_RESOURCE, sampler=sampler, span_limits=span_limits)
+    trace_provider.add_span_processor(_build_span_processor())
     trace.set_tracer_provider(trace_provider)
 
+
+def configure_opentelemetry():
+    """Wire up Tracer/Logger/Meter providers with OTLP exporters."""
+    # --- Traces ---
+    # With ENABLE_TRACING=false no TracerProvider is installed: the API's
+    # no-op tracer is used and no span export thread starts.
+    if os.getenv("ENABLE_TRACING", "true").lower() == "true":
+        _configure_tracing()
+
     # --- Logs ---
-    log_provider = LoggerProvider(resource=resource)
+    log_provider = LoggerProvider(resource=_RESOURCE)
     log_provider.add_log_record_processor(
-        BatchLogRecordProcessor(OTLPLogExporter(endpoint=OTLP_ENDPOINT, insecure=True))
+        BatchLogRecordProcessor(OTLPLogExporter(endpoint=OTLP_ENDPOINT, **_GRPC_EXPORTER_OPTIONS))
     )
     set_logger_provider(log_provider)
     otel_handler = LoggingHandler(logger_provider=log_provider)
@@ -84,10 +198,10 @@ def configure_opentelemetry():
 
     # --- Metrics ---
     metric_reader = PeriodicExportingMetricReader(
-        OTLPMetricExporter(endpoint=OTLP_ENDPOINT, insecure=True),
+        OTLPMetricExporter(endpoint=OTLP_ENDPOINT, **_GRPC_EXPORTER_OPTIONS),
         export_interval_millis=5000,
     )
-    meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
+    meter_provider = MeterProvider(resource=_RESOURCE, metric_readers=[metric_reader])
     metrics.set_meter_provider(meter_provider)
 
     return (
@@ -99,6 +213,27 @@ def configure_opentelemetry():
 
 tracer, logger, meter = configure_opentelemetry()
 
+# With no SDK provider installed the API hands out a proxy/no-op tracer, so
+# span bodies can skip straight to the business logic.
+TRACING_ENABLED = not isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider)
+
+
+def _span(name: str):
+    """Start a span, or reuse the current (non-recording) span when tracing is disabled.
+
+    Yielding the current span keeps any propagated trace context visible, just
+    like the API's no-op tracer does.
+    """
+    if TRACING_ENABLED:
+        return tracer.start_as_current_span(name)
+    return contextlib.nullcontext(trace.get_current_span())
+
+
+def _rec(span) -> bool:
+    """Only build attributes and events for spans that will be exported."""
+    return span.is_recording()
+
+
 # --- Metric instruments ---
 request_counter = meter.create_counter(
     "slice_session.requests", description="Total slice session activation requests", unit="1"
@@ -113,28 +248,47 @@ admission_decisions = meter.create_counter(
     "ric.admission_decisions", description="RIC admission decisions", unit="1"
 )
 
+
 # --- FastAPI app + auto instrumentation ---
-app = FastAPI()
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one pooled HTTPX client across requests for keep-alive reuse."""
+    app.state.http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=5.0,
+    )
+    HTTPXClientInstrumentor.instrument_client(app.state.http_client)  # client spans for outbound HTTP
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 FastAPIInstrumentor.instrument_app(app)  # server spans for inbound requests
-HTTPXClientInstrumentor().instrument()  # client spans for outbound HTTP
 
 
 async def validate_subscriber(session_id: str) -> dict:
     """Validate subscriber eligibility and attach privacy-safe subscriber context."""
-    with tracer.start_as_current_span("subscriber.validate") as span:
+    with _span("subscriber.validate") as span:
         subscriber = {
             "supi_hash": "sha256:demo-26201-9876543210",
             "tenant": "consumer_mobile",
             "plmn_mcc": "262",
             "plmn_mnc": "01",
         }
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("user.hash", subscriber["supi_hash"])
-        span.set_attribute("network.carrier.mcc", subscriber["plmn_mcc"])
-        span.set_attribute("network.carrier.mnc", subscriber["plmn_mnc"])
-        span.set_attribute("network.connection.type", "cell")
-        span.set_attribute("network.connection.subtype", "nr")
-        span.add_event("subscriber.eligibility.checked", {"eligible": True})
+        if _rec(span):
+            span.set_attributes(
+                {
+                    "app.session.id": session_id,
+                    "user.hash": subscriber["supi_hash"],
+                    "network.carrier.mcc": subscriber["plmn_mcc"],
+                    "network.carrier.mnc": subscriber["plmn_mnc"],
+                    "network.connection.type": "cell",
+                    "network.connection.subtype": "nr",
+                }
+            )
+            span.add_event("subscriber.eligibility.checked", _ELIGIBLE_EVENT)
         await asyncio.sleep(0.04)
         logger.info("Subscriber validated", extra={"session_id": session_id, "tenant": subscriber["tenant"]})
         return subscriber
@@ -142,7 +296,7 @@ async def validate_subscriber(session_id: str) -> dict:
 
 async def resolve_slice_profile(session_id: str) -> dict:
     """Resolve the requested slice and QoS profile."""
-    with tracer.start_as_current_span("slice.resolve_profile") as span:
+    with _span("slice.resolve_profile") as span:
         slice_profile = {
             "service_type": 1,
             "differentiator": "010203",
@@ -150,12 +304,17 @@ async def resolve_slice_profile(session_id: str) -> dict:
             "five_qi": 9,
             "priority_level": 6,
         }
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("telecom.3gpp.slice.service_type", slice_profile["service_type"])
-        span.set_attribute("telecom.3gpp.slice.differentiator", slice_profile["differentiator"])
-        span.set_attribute("telecom.3gpp.qos.flow.5qi", slice_profile["five_qi"])
-        span.set_attribute("telecom.3gpp.qos.priority_level", slice_profile["priority_level"])
-        span.add_event("slice.profile.resolved", {"slice.name": slice_profile["name"]})
+        if _rec(span):
+            span.set_attributes(
+                {
+                    "app.session.id": session_id,
+                    "telecom.3gpp.slice.service_type": slice_profile["service_type"],
+                    "telecom.3gpp.slice.differentiator": slice_profile["differentiator"],
+                    "telecom.3gpp.qos.flow.5qi": slice_profile["five_qi"],
+                    "telecom.3gpp.qos.priority_level": slice_profile["priority_level"],
+                }
+            )
+            span.add_event("slice.profile.resolved", {"slice.name": slice_profile["name"]})
         await asyncio.sleep(0.05)
         logger.info("Slice profile resolved", extra={"session_id": session_id, "slice_name": slice_profile["name"], "five_qi": slice_profile["five_qi"]})
         return slice_profile
@@ -163,90 +322,111 @@ async def resolve_slice_profile(session_id: str) -> dict:
 
 async def enrich_with_radio_context(session_id: str) -> None:
     """Attach 3GPP and O-RAN radio context to the trace."""
-    with tracer.start_as_current_span("radio.context_enrichment") as span:
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("telecom.3gpp.nr.cell.id", "0x4f12c7")
-        span.set_attribute("telecom.3gpp.nr.band", "n78")
-        span.set_attribute("telecom.3gpp.nr.pci", 123)
+    with _span("radio.context_enrichment") as span:
+        if _rec(span):
+            span.set_attributes(
+                {
+                    "app.session.id": session_id,
+                    "telecom.3gpp.nr.cell.id": "0x4f12c7",
+                    "telecom.3gpp.nr.band": "n78",
+                    "telecom.3gpp.nr.pci": 123,
+                }
+            )
         await asyncio.gather(
             fetch_near_rt_ric_policy(session_id),
-            check_o_du_health(),
+            check_o_du_health(span),
         )
-        span.add_event("radio.context.complete")
+        if _rec(span):
+            span.add_event("radio.context.complete")
 
 
 async def fetch_near_rt_ric_policy(session_id: str) -> None:
-    with tracer.start_as_current_span("ric.policy_fetch") as span:
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("telecom.o_ran.near_rt_ric.id", "ric-210-ne")
-        span.set_attribute("telecom.o_ran.policy.id", "policy-embb-default")
-        span.add_event("ric.policy.loaded", {"policy.version": "2026.05.11"})
+    with _span("ric.policy_fetch") as span:
+        if _rec(span):
+            span.set_attributes({"app.session.id": session_id, **_RIC_ATTRS})
+            span.add_event("ric.policy.loaded", _RIC_POLICY_EVENT)
         await asyncio.sleep(0.04)
 
 
-async def check_o_du_health() -> None:
-    with tracer.start_as_current_span("odu.health_check") as span:
-        span.set_attribute("telecom.o_ran.o_du.id", "odu-201")
-        span.set_attribute("telecom.o_ran.o_du.state", "active")
-        span.add_event("odu.heartbeat", {"latency.ms": 2.3})
-        await asyncio.sleep(0.03)
+async def check_o_du_health(span: trace.Span) -> None:
+    """Record the O-DU heartbeat as an event on the enrichment span.
+
+    The heartbeat is a local status probe, so a child span would only add
+    export volume without adding a meaningful step to the trace.
+    """
+    if _rec(span):
+        span.add_event("odu.heartbeat", _ODU_HEARTBEAT_EVENT)
+    await asyncio.sleep(0.03)
 
 
 async def evaluate_ric_admission(session_id: str, slice_profile: dict) -> bool:
     """Ask the near-RT RIC whether this slice session should be admitted."""
-    with tracer.start_as_current_span("ric.admission_decision") as span:
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("telecom.o_ran.near_rt_ric.id", "ric-210-ne")
-        span.set_attribute("telecom.o_ran.policy.id", "policy-embb-default")
-        span.set_attribute("telecom.3gpp.slice.service_type", slice_profile["service_type"])
-        span.set_attribute("telecom.3gpp.slice.differentiator", slice_profile["differentiator"])
+    with _span("ric.admission_decision") as span:
+        if _rec(span):
+            span.set_attributes(
+                {
+                    "app.session.id": session_id,
+                    **_RIC_ATTRS,
+                    "telecom.3gpp.slice.service_type": slice_profile["service_type"],
+                    "telecom.3gpp.slice.differentiator": slice_profile["differentiator"],
+                }
+            )
         await asyncio.sleep(0.06)
 
         if session_id == "deny":
             reason = "RIC admission denied for requested slice"
             span.set_status(Status(StatusCode.ERROR, reason))
-            span.add_event("ric.admission.denied", {"reason": "policy_capacity_guard"})
+            if _rec(span):
+                span.add_event("ric.admission.denied", _RIC_DENIED_EVENT)
             admission_decisions.add(1, {"decision": "denied"})
             logger.warning("RIC admission denied", extra={"session_id": session_id, "reason": "policy_capacity_guard"})
             return False
 
-        span.add_event("ric.admission.accepted", {"decision.latency.ms": 14.2})
+        if _rec(span):
+            span.add_event("ric.admission.accepted", _RIC_ACCEPTED_EVENT)
         admission_decisions.add(1, {"decision": "accepted"})
         logger.info("RIC admission accepted", extra={"session_id": session_id})
         return True
 
 
 async def check_charging_quota(session_id: str, slice_profile: dict) -> None:
-    with tracer.start_as_current_span("charging.quota_check") as span:
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("telecom.3gpp.chf.id", "chf-12")
-        span.set_attribute("telecom.3gpp.charging.mode", "online")
-        span.set_attribute("telecom.3gpp.slice.service_type", slice_profile["service_type"])
-        span.add_event("charging.quota.validated", {"quota.mb": 2048})
+    with _span("charging.quota_check") as span:
+        if _rec(span):
+            span.set_attributes(
+                {
+                    "app.session.id": session_id,
+                    **_CHARGING_ATTRS,
+                    "telecom.3gpp.slice.service_type": slice_profile["service_type"],
+                }
+            )
+            span.add_event("charging.quota.validated", _QUOTA_EVENT)
         await asyncio.sleep(0.05)
 
 
 async def commit_provisioning(session_id: str, slice_profile: dict) -> float:
     """Call a second instrumented endpoint so HTTP propagation is visible."""
-    with tracer.start_as_current_span("provisioning.commit") as span:
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("telecom.3gpp.slice.service_type", slice_profile["service_type"])
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{PROVISIONING_URL}/{session_id}",
-                json={
-                    "slice": {
-                        "service_type": slice_profile["service_type"],
-                        "differentiator": slice_profile["differentiator"],
-                    }
-                },
+    with _span("provisioning.commit") as span:
+        if _rec(span):
+            span.set_attributes(
+                {"app.session.id": session_id, "telecom.3gpp.slice.service_type": slice_profile["service_type"]}
             )
-            response.raise_for_status()
 
-        upstream_ms = response.elapsed.total_seconds() * 1000
-        span.set_attribute("app.provisioning_ms", upstream_ms)
-        span.add_event("provisioning.committed", response.json())
+        start = time.perf_counter()
+        response = await app.state.http_client.post(
+            f"{PROVISIONING_URL}/{session_id}",
+            json={
+                "slice": {
+                    "service_type": slice_profile["service_type"],
+                    "differentiator": slice_profile["differentiator"],
+                }
+            },
+        )
+        response.raise_for_status()
+
+        upstream_ms = (time.perf_counter() - start) * 1000
+        if _rec(span):
+            span.set_attribute("app.provisioning_ms", upstream_ms)
+            span.add_event("provisioning.committed", response.json())
         logger.info("Provisioning committed", extra={"session_id": session_id, "provisioning_ms": upstream_ms})
         return upstream_ms
 
@@ -256,31 +436,39 @@ async def activate_slice_session(session_id: str, request: Request):
     start_time = time.perf_counter()
     request_counter.add(1, {"session_id": session_id})
 
+    # Looked up once; reused for both attribute batches below.
     server_span = trace.get_current_span()
-    client_ip = request.client.host if request.client else ""
-    server_span.set_attribute("client.address", client_ip)
-    server_span.set_attribute("app.session.id", session_id)
+    server_recording = _rec(server_span)
+    if server_recording:
+        client = request.client
+        client_ip = client.host if client is not None else ""
+        server_span.set_attributes({"client.address": client_ip, "app.session.id": session_id})
 
     denial_reason = ""
-    with tracer.start_as_current_span("slice_session.activate") as span:
-        span.set_attribute("app.session.id", session_id)
+    with _span("slice_session.activate") as span:
+        if _rec(span):
+            span.set_attribute("app.session.id", session_id)
 
         trace_id_hex = format(span.get_span_context().trace_id, "032x")
         logger.info("Activation started", extra={"session_id": session_id, "trace_id": trace_id_hex})
 
         subscriber = await validate_subscriber(session_id)
-        slice_profile = await resolve_slice_profile(session_id)
-        await enrich_with_radio_context(session_id)
+        # Profile resolution and radio enrichment are independent of each other.
+        slice_profile, _ = await asyncio.gather(
+            resolve_slice_profile(session_id),
+            enrich_with_radio_context(session_id),
+        )
 
         admitted = await evaluate_ric_admission(session_id, slice_profile)
         if not admitted:
             denial_reason = "RIC admission denied for requested slice"
+            # The RIC span already carries the denial event; the status is enough here.
             span.set_status(Status(StatusCode.ERROR, denial_reason))
-            span.add_event("slice_session.activation_denied", {"reason": denial_reason})
         else:
             await check_charging_quota(session_id, slice_profile)
             provisioning_ms = await commit_provisioning(session_id, slice_profile)
-            span.add_event("slice_session.activated")
+            if _rec(span):
+                span.add_event("slice_session.activated")
 
     elapsed_ms = (time.perf_counter() - start_time) * 1000
 
@@ -293,13 +481,18 @@ async def activate_slice_session(session_id: str, request: Request):
     active_sessions.add(1, {"slice.service_type": str(slice_profile["service_type"])})
     logger.info("Activation complete", extra={"session_id": session_id, "duration_ms": elapsed_ms})
 
-    server_span.set_attribute("user.hash", subscriber["supi_hash"])
-    server_span.set_attribute("network.carrier.mcc", subscriber["plmn_mcc"])
-    server_span.set_attribute("network.carrier.mnc", subscriber["plmn_mnc"])
-    server_span.set_attribute("telecom.3gpp.slice.service_type", slice_profile["service_type"])
-    server_span.set_attribute("telecom.3gpp.slice.differentiator", slice_profile["differentiator"])
-    server_span.set_attribute("telecom.3gpp.qos.flow.5qi", slice_profile["five_qi"])
-    server_span.set_attribute("app.provisioning_ms", provisioning_ms)
+    if server_recording:
+        server_span.set_attributes(
+            {
+                "user.hash": subscriber["supi_hash"],
+                "network.carrier.mcc": subscriber["plmn_mcc"],
+                "network.carrier.mnc": subscriber["plmn_mnc"],
+                "telecom.3gpp.slice.service_type": slice_profile["service_type"],
+                "telecom.3gpp.slice.differentiator": slice_profile["differentiator"],
+                "telecom.3gpp.qos.flow.5qi": slice_profile["five_qi"],
+                "app.provisioning_ms": provisioning_ms,
+            }
+        )
 
     return {
         "id": session_id,
@@ -316,17 +509,19 @@ async def activate_slice_session(session_id: str, request: Request):
 @app.post("/provisioning/slice-sessions/{session_id}")
 async def provision_slice_session(session_id: str, payload: dict):
     """Tiny downstream endpoint used to show HTTP context propagation."""
-    with tracer.start_as_current_span("provisioning.write_model") as span:
-        span.set_attribute("app.session.id", session_id)
-        span.set_attribute("db.system.name", "sqlite")
-        span.set_attribute("db.query.summary", "INSERT slice_session")
-        span.set_attribute(
-            "db.query.text",
-            "INSERT INTO slice_sessions (id, sst, sd, status) VALUES (?, ?, ?, ?)",
-        )
-        span.set_attribute("telecom.3gpp.slice.service_type", payload["slice"]["service_type"])
-        span.set_attribute("telecom.3gpp.slice.differentiator", payload["slice"]["differentiator"])
-        span.add_event("provisioning.write.committed", {"status": "active"})
+    with _span("provisioning.write_model") as span:
+        if _rec(span):
+            span.set_attributes(
+                {
+                    "app.session.id": session_id,
+                    "db.system.name": "sqlite",
+                    "db.query.summary": "INSERT slice_session",
+                    "db.query.text": "INSERT INTO slice_sessions (id, sst, sd, status) VALUES (?, ?, ?, ?)",
+                    "telecom.3gpp.slice.service_type": payload["slice"]["service_type"],
+                    "telecom.3gpp.slice.differentiator": payload["slice"]["differentiator"],
+                }
+            )
+            span.add_event("provisioning.write.committed", _WRITE_COMMITTED_EVENT)
         await asyncio.sleep(0.08)
 
     return {"provisioning_status": "committed"}
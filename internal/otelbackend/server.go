@@ -4,11 +4,14 @@ import (
 	"context"
 	"errors"
 	"net"
+	"time"
 
 	colllogsv1 "go.opentelemetry.io/proto/otlp/collector/logs/v1"
 	collmetricsv1 "go.opentelemetry.io/proto/otlp/collector/metrics/v1"
 	colltracev1 "go.opentelemetry.io/proto/otlp/collector/trace/v1"
 	"google.golang.org/grpc"
+	_ "google.golang.org/grpc/encoding/gzip" // accept gzip-compressed OTLP exports
+	"google.golang.org/grpc/keepalive"
 	"google.golang.org/protobuf/proto"
 )
 
@@ -46,7 +49,12 @@ func StartGRPC(listen string, receiver *Receiver) (*Server, error) {
 	if err != nil {
 		return nil, err
 	}
-	grpcServer := grpc.NewServer()
+	// Exporters ping idle channels every 30s; the default policy would
+	// answer that with GOAWAY (too_many_pings).
+	grpcServer := grpc.NewServer(grpc.KeepaliveEnforcementPolicy(keepalive.EnforcementPolicy{
+		MinTime:             10 * time.Second,
+		PermitWithoutStream: true,
+	}))
 	colltracev1.RegisterTraceServiceServer(grpcServer, &traceService{receiver: receiver})
 	colllogsv1.RegisterLogsServiceServer(grpcServer, &logsService{receiver: receiver})
 	collmetricsv1.RegisterMetricsServiceServer(grpcServer, &metricsService{receiver: receiver})
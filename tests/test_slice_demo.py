@@ -1,15 +1,20 @@
-import datetime
 import importlib
+import os
 import sys
 import unittest
 from unittest.mock import patch
 
+import httpx
 from fastapi.testclient import TestClient
 from opentelemetry.sdk.metrics.export import MetricExporter, MetricExportResult
+from opentelemetry import trace
 from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.util._once import Once
 
 
 EXPORTED_SPANS = []
+UPSTREAM_TRACE_ID = "0af7651916cd43dd8448eb211c80319c"
+TRACEPARENT = f"00-{UPSTREAM_TRACE_ID}-b7ad6b7169203331-01"
 
 
 class CapturingExporter:
@@ -41,33 +46,30 @@ class NoOpMetricExporter(MetricExporter):
         return True
 
 
-class FakeProvisioningResponse:
-    elapsed = datetime.timedelta(milliseconds=87)
-
-    def raise_for_status(self):
-        return None
-
-    def json(self):
-        return {"provisioning_status": "committed"}
+def fake_provisioning(request):
+    # Streamed so httpx reads and closes it like a real response.
+    body = httpx.ByteStream(b'{"provisioning_status": "committed"}')
+    return httpx.Response(200, headers={"content-type": "application/json"}, stream=body)
 
 
-class FakeAsyncClient:
-    async def __aenter__(self):
-        return self
+class FakeAsyncClient(httpx.AsyncClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, transport=httpx.MockTransport(fake_provisioning), **kwargs)
 
-    async def __aexit__(self, exc_type, exc, tb):
-        return False
 
-    async def post(self, url, json):
-        return FakeProvisioningResponse()
+def reset_tracer_provider():
+    # The API only lets a process set the global provider once.
+    trace._TRACER_PROVIDER_SET_ONCE = Once()
+    trace._TRACER_PROVIDER = None
 
 
-def load_demo_app():
+def load_demo_app(env=None):
     for module_name in list(sys.modules):
         if module_name == "app":
             del sys.modules[module_name]
 
-    with patch(
+    reset_tracer_provider()
+    with patch.dict(os.environ, env or {}), patch(
         "opentelemetry.exporter.otlp.proto.grpc.trace_exporter.OTLPSpanExporter",
         CapturingExporter,
     ), patch(
@@ -88,6 +90,11 @@ class SliceDemoTest(unittest.TestCase):
     def setUpClass(cls):
         cls.demo = load_demo_app()
         cls.client = TestClient(cls.demo.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
 
     def setUp(self):
         EXPORTED_SPANS.clear()
@@ -110,6 +117,17 @@ class SliceDemoTest(unittest.TestCase):
         self.assertIn("ric.admission_decision", span_names)
         self.assertIn("charging.quota_check", span_names)
         self.assertIn("provisioning.commit", span_names)
+        self.assertIn("POST", span_names)
+        self.assertNotIn("odu.health_check", span_names)
+
+        spans = {span.name: span for span in EXPORTED_SPANS}
+        heartbeats = [
+            event for event in spans["radio.context_enrichment"].events if event.name == "odu.heartbeat"
+        ]
+        self.assertEqual(len(heartbeats), 1)
+        self.assertEqual(heartbeats[0].attributes["telecom.o_ran.o_du.id"], "odu-201")
+        self.assertEqual(heartbeats[0].attributes["telecom.o_ran.o_du.state"], "active")
+        self.assertEqual(heartbeats[0].attributes["latency.ms"], 2.3)
 
     def test_policy_denial_is_a_clean_error_trace(self):
         response = self.client.post("/slice-sessions/deny/activate")
@@ -123,6 +141,11 @@ class SliceDemoTest(unittest.TestCase):
         self.assertEqual(spans["ric.admission_decision"].status.status_code.name, "ERROR")
         self.assertEqual(spans["slice_session.activate"].status.status_code.name, "ERROR")
 
+        ric_events = [event.name for event in spans["ric.admission_decision"].events]
+        activate_events = [event.name for event in spans["slice_session.activate"].events]
+        self.assertIn("ric.admission.denied", ric_events)
+        self.assertNotIn("slice_session.activation_denied", activate_events)
+
         for span_name in ("ric.admission_decision", "slice_session.activate"):
             exception_events = [
                 event for event in spans[span_name].events if event.name == "exception"
@@ -130,5 +153,73 @@ class SliceDemoTest(unittest.TestCase):
             self.assertEqual(exception_events, [])
 
 
+class TracingDisabledTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.demo = load_demo_app({"ENABLE_TRACING": "false"})
+        cls.client = TestClient(cls.demo.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def setUp(self):
+        EXPORTED_SPANS.clear()
+
+    def test_disabled_tracing_keeps_upstream_trace_context(self):
+        self.assertFalse(self.demo.TRACING_ENABLED)
+
+        with self.assertLogs("slice-activation-api", level="INFO") as logs:
+            activated = self.client.post(
+                "/slice-sessions/session-42/activate", headers={"traceparent": TRACEPARENT}
+            )
+            denied = self.client.post("/slice-sessions/deny/activate", headers={"traceparent": TRACEPARENT})
+
+        self.assertEqual(activated.status_code, 200)
+        self.assertEqual(denied.status_code, 403)
+        self.assertEqual(EXPORTED_SPANS, [])
+
+        started = [record for record in logs.records if record.getMessage() == "Activation started"]
+        self.assertEqual([record.trace_id for record in started], [UPSTREAM_TRACE_ID] * 2)
+
+
+class ConfigFallbackTest(unittest.TestCase):
+    def test_malformed_bsp_setting_falls_back_to_default(self):
+        with self.assertLogs("app", level="WARNING") as logs:
+            demo = load_demo_app({"OTEL_BSP_SCHEDULE_DELAY": "1s"})
+
+        self.assertTrue(demo.TRACING_ENABLED)
+        self.assertIn("Invalid value '1s' for OTEL_BSP_SCHEDULE_DELAY, using 1000", logs.output[0])
+
+    def test_invalid_sampler_ratio_falls_back_to_always_sample(self):
+        for value in ("abc", "2"):
+            with self.subTest(value=value):
+                with self.assertLogs("app", level="WARNING") as logs:
+                    demo = load_demo_app({"OTEL_TRACES_SAMPLER_ARG": value})
+
+                self.assertIn(f"Invalid value '{value}' for OTEL_TRACES_SAMPLER_ARG, using 1.0", logs.output[0])
+                self.assertIn("TraceIdRatioBased{1.0}", demo.trace.get_tracer_provider().sampler.get_description())
+
+    def test_generic_otlp_protocol_does_not_switch_span_exporter(self):
+        demo = load_demo_app({"OTEL_EXPORTER_OTLP_PROTOCOL": "http/protobuf"})
+
+        self.assertIsInstance(demo._build_span_exporter(), CapturingExporter)
+
+    def test_unsupported_traces_protocol_falls_back_to_grpc(self):
+        demo = load_demo_app({"OTEL_EXPORTER_OTLP_TRACES_PROTOCOL": "http/json"})
+
+        with self.assertLogs("app", level="WARNING") as logs:
+            exporter = demo._build_span_exporter()
+
+        self.assertIsInstance(exporter, CapturingExporter)
+        self.assertIn("Unsupported value 'http/json' for OTEL_EXPORTER_OTLP_TRACES_PROTOCOL", logs.output[0])
+
+    def test_explicit_sampler_setting_is_honoured(self):
+        demo = load_demo_app({"OTEL_TRACES_SAMPLER": "always_off"})
+
+        self.assertEqual(demo.trace.get_tracer_provider().sampler.get_description(), "AlwaysOffSampler")
+
+
 if __name__ == "__main__":
     unittest.main()